@@ -1,3 +1,8 @@
+from dotenv import load_dotenv
+
+# Load .env once, before any module below reads the environment at import time
+load_dotenv()
+
 from src.utils.config import validate_settings
 from src.utils.database import init_db
 from src.utils.logging import logger
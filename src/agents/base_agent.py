@@ -1,11 +1,11 @@
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 from pydantic import BaseModel
 from mistralai import Mistral, UserMessage
-from dotenv import load_dotenv
 import os
 import asyncio
-load_dotenv()
+import hashlib
+from collections import OrderedDict
 
 class AgentResponse(BaseModel):
     success: bool
@@ -13,11 +13,15 @@ class AgentResponse(BaseModel):
     error: Optional[str] = None
 
 class BaseAgent:
-    def __init__(self, name: str, description: str):
+    def __init__(self, name: str, description: str, cache_size: int = 0):
         self.name = name
         self.description = description
         self.client = Mistral(api_key=os.getenv("MISTRAL_API_KEY"))
         
+        # LRU cache of LLM responses keyed on a digest of the prompt (disabled when 0)
+        self.cache_size = cache_size
+        self._response_cache: "OrderedDict[str, str]" = OrderedDict()
+        
     async def process(self, input_data: Dict[str, Any]) -> AgentResponse:
         """
         Process the input data and return a response
@@ -32,11 +36,24 @@ class BaseAgent:
         """
         raise NotImplementedError("Child classes must implement _format_prompt method")
     
-    async def _call_llm(self, prompt: str) -> str:
+    async def _call_llm(self, prompt: str, on_token: Optional[Callable[[str], None]] = None) -> str:
         """
         Call the LLM with the formatted prompt
+        Identical prompts are served from the response cache when enabled
+        If on_token is given, it is called with each chunk of the response as it streams in
         """
+        if self.cache_size:
+            cache_key = self._cache_key(prompt)
+            if cache_key in self._response_cache:
+                self._response_cache.move_to_end(cache_key)
+                cached_response = self._response_cache[cache_key]
+                if on_token:
+                    on_token(cached_response)
+                return cached_response
+        
         try:
+            # The agent's static instructions go in the system prompt so every request shares a
+            # byte-stable prefix the provider can cache; only per-request data goes in the user prompt
             messages = [
                 {"role": "system", "content": self.description},
                 {"role": "user", "content": prompt}
@@ -55,9 +72,26 @@ class BaseAgent:
                     delta = chunk.choices[0].delta.content  # fallback
                 if delta:
                     full_response += delta
+                    if on_token:
+                        on_token(delta)
 
             return full_response
 
         except Exception as e:
             return str(e)
+    
+    def _cache_key(self, prompt: str) -> str:
+        """Digest of a prompt, used as its response cache key"""
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    
+    def _cache_response(self, prompt: str, response: str) -> None:
+        """
+        Add a response to the response cache (when enabled)
+        Child classes call this once the response has parsed, so a malformed one can be retried
+        """
+        if not self.cache_size:
+            return
+        self._response_cache[self._cache_key(prompt)] = response
+        if len(self._response_cache) > self.cache_size:
+            self._response_cache.popitem(last=False)
             
\ No newline at end of file
@@ -1,6 +1,6 @@
 from typing import Any, Dict, List
 from .base_agent import BaseAgent, AgentResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 import json
 from src.utils.json_helpers import extract_json_block
 
@@ -10,11 +10,43 @@ class TaskEstimate(BaseModel):
     confidence_score: float
     historical_data_used: bool
 
+# Batch (de)serializer for estimate lists, avoids per-model model_dump calls
+TASK_ESTIMATE_LIST = TypeAdapter(List[TaskEstimate])
+
+ESTIMATOR_SYSTEM_PROMPT = """You are a task duration estimation agent that predicts how long tasks will take based on their description and historical data.
+
+For each task, estimate:
+1. Duration in minutes
+2. Confidence score (0-1)
+3. Whether historical data was used
+
+IMPORTANT: Use the numeric Task ID value (not the title) as the task_id in your response.
+
+For each task, return a JSON object with the following fields:
+- "task_id": the numeric ID of the task (e.g., "1", "2", "3")
+- "estimated_duration_minutes": integer — your estimate of how long the task will take in minutes
+- "confidence_score": float between 0 and 1 — your confidence level in the estimate
+- "historical_data_used": boolean — true if the estimate used historical data, otherwise false
+
+### Output Format (JSON Array):
+[
+{
+    "task_id": "1",
+    "estimated_duration_minutes": 120,
+    "confidence_score": 0.8,
+    "historical_data_used": false
+},
+...
+]
+
+Do not include markdown or extra commentary. Return only a valid JSON array"""
+
 class EstimatorAgent(BaseAgent):
     def __init__(self):
         super().__init__(
             name="Estimator Agent",
-            description="You are a task duration estimation agent that predicts how long tasks will take based on their description and historical data. "
+            description=ESTIMATOR_SYSTEM_PROMPT,
+            cache_size=16
         )
     
     def _format_prompt(self, input_data: Dict[str, Any]) -> str:
@@ -35,32 +67,6 @@ class EstimatorAgent(BaseAgent):
         
         Historical Data (if available):
         {json.dumps(historical_data, indent=2)}
-        
-        For each task, estimate:
-        1. Duration in minutes
-        2. Confidence score (0-1)
-        3. Whether historical data was used
-        
-        IMPORTANT: Use the numeric Task ID value (not the title) as the task_id in your response.
-        
-        For each task, return a JSON object with the following fields:
-        - "task_id": the numeric ID of the task (e.g., "1", "2", "3")
-        - "estimated_duration_minutes": integer — your estimate of how long the task will take in minutes
-        - "confidence_score": float between 0 and 1 — your confidence level in the estimate
-        - "historical_data_used": boolean — true if the estimate used historical data, otherwise false
-
-        ### Output Format (JSON Array):
-        [
-        {{
-            "task_id": "1",
-            "estimated_duration_minutes": 120,
-            "confidence_score": 0.8,
-            "historical_data_used": false
-        }},
-        ...
-        ]
-
-        Do not include markdown or extra commentary. Return only a valid JSON array
         """
         return prompt.strip()
     
@@ -70,7 +76,7 @@ class EstimatorAgent(BaseAgent):
                 raise TypeError(f"Expected input_data to be a dict, got {type(input_data)}: {repr(input_data)}")
 
             prompt = self._format_prompt(input_data)
-            raw_response = await self._call_llm(prompt)
+            raw_response = await self._call_llm(prompt, input_data.get("on_token"))
 
             try:
                 response_json = extract_json_block(raw_response)
@@ -112,6 +118,8 @@ class EstimatorAgent(BaseAgent):
                 except Exception as e:
                     print(f"Validation error for TaskEstimate: {estimate} — {str(e)}")
 
+            if estimates:
+                self._cache_response(prompt, raw_response)
             return AgentResponse(success=True, data={"estimates": estimates})
 
         except Exception as e:
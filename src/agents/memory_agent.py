@@ -4,8 +4,12 @@ from pydantic import BaseModel
 import chromadb
 from chromadb.config import Settings
 import json
+import asyncio
 from datetime import datetime
+from statistics import mean, median
 from src.utils.json_helpers import extract_json_block
+from src.utils.config import get_settings
+from src.utils.logging import logger
 
 class TaskFeedback(BaseModel):
     task_id: str
@@ -70,6 +74,7 @@ class MemoryAgent(BaseAgent):
         feedback_data = {
             "task_id": feedback.task_id,
             "actual_duration_minutes": feedback.actual_duration_minutes,
+            "estimated_duration_minutes": feedback.estimated_duration_minutes,
             "accuracy_feedback": feedback.accuracy_feedback,
             "priority_feedback": feedback.priority_feedback,
             "notes": feedback.notes,
@@ -102,19 +107,57 @@ class MemoryAgent(BaseAgent):
             })
         return similar_tasks
     
+    def _store_and_retrieve(self, feedback: TaskFeedback, task_description: str) -> List[Dict]:
+        # Store the feedback, then get similar tasks for analysis
+        self._store_feedback(feedback)
+        return self._get_similar_tasks(task_description)
+    
+    def _summarize_feedback(self) -> Dict[str, Any]:
+        """
+        Aggregate stored feedback into a few rounded statistics. Rounding keeps the summary,
+        and so the estimator prompt, unchanged across most new feedback.
+        """
+        results = self.collection.get(include=["documents", "metadatas"])
+        
+        accuracies = [m["accuracy"] for m in results.get('metadatas') or [] if m and "accuracy" in m]
+        if len(accuracies) < get_settings().MIN_FEEDBACK_SAMPLES:
+            return {}
+        
+        duration_ratios = []
+        for doc in results.get('documents') or []:
+            try:
+                data = json.loads(doc)
+            except json.JSONDecodeError:
+                continue
+            if data.get("estimated_duration_minutes"):
+                duration_ratios.append(data["actual_duration_minutes"] / data["estimated_duration_minutes"])
+        
+        summary = {"mean_accuracy_feedback": round(mean(accuracies), 1)}
+        if duration_ratios:
+            summary["median_actual_to_estimated_duration"] = round(median(duration_ratios), 1)
+        return summary
+    
+    async def get_historical_data(self) -> Dict[str, Any]:
+        """
+        Get a compact summary of past feedback for the estimator, without blocking the event loop
+        """
+        try:
+            return await asyncio.to_thread(self._summarize_feedback)
+        except Exception as e:
+            logger.warning(f"Failed to load historical data: {str(e)}")
+            return {}
+    
     async def process(self, input_data: Dict[str, Any]) -> AgentResponse:
         try:
-            # Store the feedback
             feedback = TaskFeedback(**input_data.get("feedback", {}))
-            self._store_feedback(feedback)
-
-            # Get similar tasks for analysis
             task_description = input_data.get("task", {}).get("description", "")
-            similar_tasks = self._get_similar_tasks(task_description)
 
-            # Get LLM analysis
-            prompt = self._format_prompt(input_data)
-            raw_response = await self._call_llm(prompt)
+            # Storing the feedback and the similarity search embed text in ChromaDB, so run
+            # them in a worker thread while the LLM analysis is in flight
+            similar_tasks, raw_response = await asyncio.gather(
+                asyncio.to_thread(self._store_and_retrieve, feedback, task_description),
+                self._call_llm(self._format_prompt(input_data))
+            )
 
             try:
                 # First try to extract JSON block
@@ -1,6 +1,6 @@
 from typing import Any, Dict, List, Union
 from .base_agent import BaseAgent, AgentResponse
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 import json
 import asyncio
 from src.utils.json_helpers import extract_json_block, robust_json_load
@@ -17,11 +17,25 @@ class Subtask(BaseModel):
         extra="allow"
     )
 
+# Batch (de)serializer for subtask lists, avoids per-model model_dump calls
+SUBTASK_LIST = TypeAdapter(List[Subtask])
+
+PLANNER_SYSTEM_PROMPT = """You are a task planning agent that breaks down high-level projects into structured subtasks with dependencies.
+
+Break each project down into subtasks with the following structure:
+- Each subtask should have a unique ID
+- Include a clear title and description
+- Specify dependencies (IDs of tasks that must be completed first)
+- Assign a priority level (1-5, where 5 is highest)
+
+Return the response in JSON format."""
+
 class PlannerAgent(BaseAgent):
     def __init__(self):
         super().__init__(
             name="Planner Agent",
-            description="You are a task planning agent that breaks down high-level projects into structured subtasks with dependencies."
+            description=PLANNER_SYSTEM_PROMPT,
+            cache_size=16
         )
     
     def _format_prompt(self, input_data: Dict[str, Any]) -> str:
@@ -34,20 +48,14 @@ class PlannerAgent(BaseAgent):
         Constraints:
         {chr(10).join(f"- {constraint}" for constraint in constraints)}
         
-        Please break down this project into subtasks with the following structure:
-        - Each subtask should have a unique ID
-        - Include a clear title and description
-        - Specify dependencies (IDs of tasks that must be completed first)
-        - Assign a priority level (1-5, where 5 is highest)
-        
-        Return the response in JSON format.
+        Please break down this project into subtasks.
         """
         return prompt
     
     async def process(self, input_data: Dict[str, Any]) -> AgentResponse:
         try:
             prompt = self._format_prompt(input_data)
-            raw_response = await self._call_llm(prompt)
+            raw_response = await self._call_llm(prompt, input_data.get("on_token"))
 
             print("[PLANNER_AGENT] Raw response:", repr(raw_response))
 
@@ -90,6 +98,8 @@ class PlannerAgent(BaseAgent):
                 except Exception as e:
                     print(f"Skipping task due to validation error: {task} — {str(e)}")
 
+            if subtasks:
+                self._cache_response(prompt, raw_response)
             return AgentResponse(success=True, data={"subtasks": subtasks})
 
         except Exception as e:
@@ -3,6 +3,7 @@ from .base_agent import BaseAgent, AgentResponse
 from pydantic import BaseModel
 from ortools.sat.python import cp_model
 import json
+import asyncio
 from datetime import datetime, timedelta
 from src.utils.json_helpers import extract_json_block
 import traceback
@@ -17,23 +18,35 @@ class ScheduledTask(BaseModel):
     assigned_to: str
     deadline: Optional[datetime] = None
 
+SCHEDULER_SYSTEM_PROMPT = """You are a task scheduling agent that creates optimized schedules while respecting dependencies and constraints.
+
+Provide a schedule that:
+1. Respects task dependencies
+2. Optimizes for priority and deadlines
+3. Considers resource availability
+4. Minimizes context switching
+
+Return the response in JSON format."""
+
 class SchedulerAgent(BaseAgent):
     def __init__(self):
         super().__init__(
             name="Scheduler Agent",
-            description="You are a task scheduling agent that creates optimized schedules while respecting dependencies and constraints."
+            description=SCHEDULER_SYSTEM_PROMPT,
+            cache_size=16
         )
         self.model = cp_model.CpModel()
         self.time_parser = TimeConstraintParser()
-        self.calendar_service = get_calendar_service()
     
     def _get_unavailable_times(self, start_time: datetime, end_time: datetime) -> List[Tuple[datetime, datetime]]:
         """Get unavailable time slots from Google Calendar"""
-        if not self.calendar_service:
+        # Fetched per call rather than kept on the agent, so expired credentials get rebuilt
+        calendar_service = get_calendar_service()
+        if not calendar_service:
             return []
             
         try:
-            events = get_calendar_events(self.calendar_service, start_time, end_time)
+            events = get_calendar_events(calendar_service, start_time, end_time)
             unavailable_times = []
             for event in events:
                 event_start = datetime.fromisoformat(event['start']['dateTime'].replace('Z', '+00:00'))
@@ -44,6 +57,27 @@ class SchedulerAgent(BaseAgent):
             logger.error(f"Error getting calendar events: {str(e)}")
             return []
 
+    async def prepare(self, constraints: List[str]) -> Dict[str, Any]:
+        """
+        Resolve the scheduling inputs that do not depend on task estimates
+        (global constraints and calendar availability), so they can be fetched
+        while estimation is still running.
+        
+        Args:
+            constraints: List of constraint strings
+            
+        Returns:
+            Dictionary to pass as "prepared" in the scheduler's input data
+        """
+        start_time = datetime.now()
+        end_time = start_time + timedelta(days=180)  # 6 months window
+        unavailable_times = await asyncio.to_thread(self._get_unavailable_times, start_time, end_time)
+        
+        return {
+            "global_constraints": self.time_parser.extract_global_constraints(constraints),
+            "unavailable_times": unavailable_times
+        }
+
     def _format_prompt(self, input_data: Dict[str, Any]) -> str:
         tasks = input_data.get("tasks", [])
         estimates = input_data.get("estimates", [])
@@ -59,17 +93,11 @@ class SchedulerAgent(BaseAgent):
         Constraints:
         {chr(10).join(f"- {constraint}" for constraint in constraints)}
         
-        Please provide a schedule that:
-        1. Respects task dependencies
-        2. Optimizes for priority and deadlines
-        3. Considers resource availability
-        4. Minimizes context switching
-        
-        Return the response in JSON format.
+        Please provide a schedule for these tasks.
         """
         return prompt
     
-    def _create_schedule(self, tasks: List[Dict], estimates: List[Dict], constraints: List[str]) -> List[ScheduledTask]:
+    def _create_schedule(self, tasks: List[Dict], estimates: List[Dict], constraints: List[str], prepared: Optional[Dict[str, Any]] = None) -> List[ScheduledTask]:
         model = cp_model.CpModel()
 
         # Normalize task IDs - convert to string
@@ -85,12 +113,18 @@ class SchedulerAgent(BaseAgent):
         
         # Parse time constraints from tasks and global constraints
         task_deadlines = self.time_parser.extract_task_constraints(tasks)
-        global_constraints = self.time_parser.extract_global_constraints(constraints)
         
-        # Get unavailable times from Google Calendar
-        start_time = datetime.now()
-        end_time = start_time + timedelta(days=180)  # 6 months window
-        unavailable_times = self._get_unavailable_times(start_time, end_time)
+        if prepared:
+            # Reuse the constraints and calendar data resolved by prepare()
+            global_constraints = prepared["global_constraints"]
+            unavailable_times = prepared["unavailable_times"]
+        else:
+            global_constraints = self.time_parser.extract_global_constraints(constraints)
+            
+            # Get unavailable times from Google Calendar
+            start_time = datetime.now()
+            end_time = start_time + timedelta(days=180)  # 6 months window
+            unavailable_times = self._get_unavailable_times(start_time, end_time)
         
         # Create a larger scheduling window to ensure feasibility
         max_time = 180 * 24 * 60  # 180 days in minutes
@@ -105,14 +139,19 @@ class SchedulerAgent(BaseAgent):
         task_end_vars = {}
         task_durations = {}
         
+        # Index estimates by task ID (first estimate per task wins)
+        estimates_by_id = {}
+        for estimate in estimates:
+            estimates_by_id.setdefault(str(estimate.get('task_id')), estimate)
+        
         # Step 1: Create variables for each task (start and end times)
         for task in tasks:
             task_id = str(task.get('id'))
-            matching_estimate = next((e for e in estimates if str(e.get('task_id')) == task_id), None)
+            matching_estimate = estimates_by_id.get(task_id)
             
             if matching_estimate is None:
                 alt_id = str(task.get('ID', task.get('id')))
-                matching_estimate = next((e for e in estimates if str(e.get('task_id')) == alt_id), None)
+                matching_estimate = estimates_by_id.get(alt_id)
                 
                 if matching_estimate is None:
                     duration = 60  # Default 1 hour
@@ -348,13 +387,14 @@ class SchedulerAgent(BaseAgent):
     async def process(self, input_data: Dict[str, Any]) -> AgentResponse:
         try:
             prompt = self._format_prompt(input_data)
-            raw_response = await self._call_llm(prompt)
+            raw_response = await self._call_llm(prompt, input_data.get("on_token"))
 
             try:
                 json_str = extract_json_block(raw_response)
                 llm_schedule = json.loads(json_str)
             except Exception as e:
                 return AgentResponse(success=False, error=f"Failed to parse LLM schedule: {e}")
+            self._cache_response(prompt, raw_response)
 
             tasks = input_data.get("tasks", [])
             estimates = input_data.get("estimates", [])
@@ -367,7 +407,9 @@ class SchedulerAgent(BaseAgent):
                 estimate['task_id'] = str(estimate.get('task_id'))
                         
             try:
-                scheduled_tasks = self._create_schedule(tasks, estimates, constraints)
+                # Fetch calendar data and run the solver off the shared event loop so other sessions keep streaming
+                prepared = input_data.get("prepared") or await self.prepare(constraints)
+                scheduled_tasks = await asyncio.to_thread(self._create_schedule, tasks, estimates, constraints, prepared)
                 
                 # Convert ScheduledTask objects to dictionaries for JSON serialization
                 scheduled_tasks_dicts = []
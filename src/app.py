@@ -1,22 +1,417 @@
 import streamlit as st
 import asyncio
-import nest_asyncio
+import threading
+import queue
 import logging
 import hashlib
+import json
 from src import initialize_app
-from src.agents.planner_agent import PlannerAgent
-from src.agents.estimator_agent import EstimatorAgent
+from src.agents.planner_agent import PlannerAgent, SUBTASK_LIST
+from src.agents.estimator_agent import EstimatorAgent, TASK_ESTIMATE_LIST
 from src.agents.scheduler_agent import SchedulerAgent
 from src.agents.memory_agent import MemoryAgent
 from datetime import datetime
-import pandas as pd
-import plotly.express as px
-import time
 import uuid
-from src.utils.database import init_db
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.database import SessionLocal, save_project_tasks, add_note, get_notes
 from src.utils.logging import logger
+from src.utils.semantic_cache import SemanticCache
+
+# Cached resources, constructed once per process instead of on every rerun
+@st.cache_resource(show_spinner=False)
+def bootstrap_app():
+    """
+    Initialize the application (settings, database tables, directories) and start the
+    background event loop once per process. Failures raise so they are not cached.
+    """
+    if not initialize_app():
+        raise RuntimeError("Failed to initialize application")
+    get_event_loop()
+    logger.info("Successfully started background event loop")
+    return True
+
+@st.cache_resource
+def get_event_loop():
+    """Start a persistent event loop on a background thread, shared across reruns"""
+    try:
+        import uvloop
+        loop = uvloop.new_event_loop()
+    except ImportError:
+        loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True, name="agent-event-loop").start()
+    return loop
+
+def run_async(coro):
+    """Run a coroutine on the background event loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
+def run_async_streaming(coro, tokens, placeholder):
+    """
+    Run a coroutine on the background event loop while rendering the LLM output
+    it pushes onto the tokens queue into a Streamlit placeholder
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+    streamed = ""
+    while not future.done():
+        try:
+            streamed += tokens.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        # Drain everything that arrived meanwhile so each UI update covers a batch of chunks
+        while not tokens.empty():
+            streamed += tokens.get_nowait()
+        placeholder.code(streamed[-2000:], language="json")
+    # Discard chunks that arrived after the last update, since the next phase streams through the same queue
+    while not tokens.empty():
+        tokens.get_nowait()
+    placeholder.empty()
+    return future.result()
+
+@st.cache_resource
+def get_planner():
+    return PlannerAgent()
+
+@st.cache_resource
+def get_estimator():
+    return EstimatorAgent()
+
+@st.cache_resource
+def get_scheduler():
+    return SchedulerAgent()
+
+@st.cache_resource
+def get_memory():
+    return MemoryAgent()
+
+@st.cache_resource
+def get_persistence_executor():
+    """Background executor for database writes, so the UI does not wait on persistence"""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="persist")
+
+def persist_project(project_id, tasks, estimates):
+    """Write a project's results to the database (runs on the persistence executor)"""
+    db = SessionLocal()
+    try:
+        save_project_tasks(db, project_id, tasks, estimates)
+        logger.info(f"Persisted project {project_id} with {len(tasks)} tasks")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to persist project {project_id}: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+@st.cache_resource
+def get_project_cache():
+    """
+    Semantic cache of planning/estimation results, matched on the project description
+    and scoped to the browser session and the exact constraints
+    """
+    return SemanticCache("project_results")
+
+async def plan_with_history(planner, memory, planning_input):
+    """Run planning concurrently with the historical data lookup for estimation"""
+    return await asyncio.gather(
+        planner.process(planning_input),
+        memory.get_historical_data()
+    )
+
+async def estimate_with_schedule_prep(estimator, scheduler, estimation_input, constraints):
+    """Run estimation concurrently with the scheduler's estimate-independent preparation"""
+    return await asyncio.gather(
+        estimator.process(estimation_input),
+        scheduler.prepare(constraints)
+    )
+
+def content_digest(obj):
+    """Compact digest of JSON-serializable content, used as an explicit cache key"""
+    payload = json.dumps(obj, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+@st.cache_data(persist="disk", show_spinner=False)
+def build_gantt(schedule_key, _schedule_df):
+    """
+    Build the Gantt chart for a schedule table, returned as figure JSON
+    Cached on schedule_key and persisted to disk so unchanged schedules skip the rebuild across restarts;
+    the underscore-prefixed DataFrame is not hashed by Streamlit
+    """
+    import plotly.express as px
+    
+    schedule_df = _schedule_df
+    fig = px.timeline(
+        schedule_df, 
+        x_start="Start Time", 
+        x_end="End Time", 
+        y="Task",
+        color="Status" if "Status" in schedule_df else "Task",
+        title="Task Schedule Gantt Chart"
+    )
+    
+    # Add deadline markers if available, in a single layout update
+    if "Deadline" in schedule_df:
+        deadline_rows = schedule_df[schedule_df["Deadline"].notna()]
+        shapes = [
+            dict(type="line", x0=d, x1=d, y0=0, y1=1, xref="x", yref="paper",
+                 line=dict(color="red", dash="dash"))
+            for d in deadline_rows["Deadline"]
+        ]
+        annotations = [
+            dict(x=d, y=1, xref="x", yref="paper", text=f"Deadline: {name}", showarrow=False)
+            for d, name in zip(deadline_rows["Deadline"], deadline_rows["Task"])
+        ]
+        fig.update_layout(shapes=shapes, annotations=annotations)
+    
+    fig.update_yaxes(autorange="reversed")
+    return fig.to_json()
+
+def render_subtasks_preview(container, subtasks):
+    """Render planned subtasks while the remaining phases are still running"""
+    import pandas as pd
+    
+    with container:
+        st.subheader("Planned Subtasks")
+        st.dataframe(
+            pd.DataFrame([{"ID": t.id, "Title": t.title, "Priority": t.priority} for t in subtasks]),
+            key="subtasks_preview"
+        )
+
+def render_estimates_preview(container, estimates, id_to_title):
+    """Render duration estimates while scheduling is still running"""
+    import pandas as pd
+    
+    with container:
+        st.subheader("Estimated Durations")
+        st.dataframe(
+            pd.DataFrame([{
+                "Task": id_to_title.get(str(e.task_id), f"Task {e.task_id}"),
+                "Duration (min)": e.estimated_duration_minutes,
+                "Confidence": round(e.confidence_score, 2)
+            } for e in estimates]),
+            key="estimates_preview"
+        )
+
+async def process_feedback_batch(memory, feedback_inputs, max_concurrency=8):
+    """Process queued feedback concurrently, bounded to respect LLM rate limits"""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def process_one(feedback_input):
+        async with semaphore:
+            return await memory.process(feedback_input)
+    
+    return await asyncio.gather(*(process_one(f) for f in feedback_inputs))
+
+def bullet_list(items):
+    """Format items as a markdown bullet list"""
+    return "\n".join(f"- {item}" for item in items)
+
+def render_feedback_analysis(analysis):
+    """Render the memory agent's feedback analysis, one markdown block per section"""
+    if isinstance(analysis, dict):
+        # Display estimation accuracy
+        if "estimation_accuracy" in analysis:
+            accuracy = analysis["estimation_accuracy"]
+            st.markdown(
+                "### Estimation Accuracy\n\n"
+                f"**Score**: {accuracy.get('score', 'N/A')}\n\n"
+                f"**Analysis**: {accuracy.get('analysis', 'No analysis available')}\n\n"
+                "**Suggestions**:\n\n"
+                f"{bullet_list(accuracy.get('suggestions', []))}\n\n"
+                "---"
+            )
+
+        # Display task patterns
+        if "task_patterns" in analysis:
+            patterns = analysis["task_patterns"]
+            st.markdown(
+                "### Task Patterns\n\n"
+                f"**Duration Patterns**: {patterns.get('duration_patterns', 'No patterns identified')}\n\n"
+                f"**Priority Patterns**: {patterns.get('priority_patterns', 'No patterns identified')}\n\n"
+                "**Common Issues**:\n\n"
+                f"{bullet_list(patterns.get('common_issues', []))}\n\n"
+                "---"
+            )
+
+        # Display recommendations
+        if "recommendations" in analysis:
+            recs = analysis["recommendations"]
+            st.markdown(
+                "### Recommendations\n\n"
+                "**Estimation Improvements**:\n\n"
+                f"{bullet_list(recs.get('estimation_improvements', []))}\n\n"
+                "**Priority Adjustments**:\n\n"
+                f"{bullet_list(recs.get('priority_adjustments', []))}\n\n"
+                "**General Suggestions**:\n\n"
+                f"{bullet_list(recs.get('general_suggestions', []))}"
+            )
+    else:
+        st.write(analysis)
+
+@st.fragment
+def render_task(task, idx, id_to_estimate, project_id):
+    """
+    Render a subtask with its completion checkbox and feedback form.
+    Runs as a fragment so interacting with one task only reruns that task.
+    """
+    # Initialize task completion state if not exists
+    task_key = f"task_completed_{task.id}_{idx}"
+    if task_key not in st.session_state:
+        st.session_state[task_key] = False
+
+    # Create columns for checkbox and expander
+    col1, col2 = st.columns([1, 20])
+
+    with col1:
+        # Checkbox for task completion
+        is_completed = st.checkbox(
+            "✓",
+            value=st.session_state[task_key],
+            key=f"checkbox_{task.id}_{idx}",
+            help="Mark task as completed"
+        )
+        st.session_state[task_key] = is_completed
+
+    with col2:
+        # Task expander with completion status
+        expander_title = f"**{task.title}** {'✅' if is_completed else ''}"
+        with st.expander(expander_title, key=f"task_expander_{task.id}_{idx}"):
+            st.write(f"Description: {task.description}")
+            st.write(f"Dependencies: {', '.join(map(str, task.dependencies))}")
+            st.write(f"Priority: {task.priority}/5")
+
+            # Find the estimate for this task
+            task_estimate = id_to_estimate.get(str(task.id))
+            if task_estimate:
+                st.write(f"Estimated Duration: {task_estimate.estimated_duration_minutes} minutes")
+                st.write(f"Confidence: {task_estimate.confidence_score:.2f}")
+
+            # Only show feedback form if task is completed
+            if is_completed:
+                st.write("---")
+                st.subheader("Task Feedback")
+
+                # The duration stays outside the form so the accuracy default follows it as it is edited
+                actual_duration = st.number_input(
+                    "Actual Duration (minutes)", 
+                    min_value=0, 
+                    max_value=1440, 
+                    value=task_estimate.estimated_duration_minutes if task_estimate else 60,
+                    key=f"duration_input_{task.id}_{idx}"
+                )
+
+                # Calculate default values
+                original_estimate = task_estimate.estimated_duration_minutes if task_estimate else 0
+                accuracy_default = min(1.0, max(0.0, 1.0 - abs(original_estimate - actual_duration) / max(original_estimate, 1)))
+
+                # The remaining feedback inputs are batched in a form so editing them does not rerun until submit
+                with st.form(f"feedback_form_{task.id}_{idx}"):
+                    # Feedback metrics
+                    accuracy = st.slider(
+                        "Accuracy Feedback (0-1)", 
+                        0.0, 1.0, 
+                        accuracy_default,
+                        key=f"accuracy_slider_{task.id}_{idx}"
+                    )
+                    priority = st.slider(
+                        "Priority Feedback (0-1)", 
+                        0.0, 1.0, 
+                        0.5,
+                        key=f"priority_slider_{task.id}_{idx}"
+                    )
+                    notes = st.text_area(
+                        "Notes",
+                        key=f"notes_input_{task.id}_{idx}"
+                    )
+
+                    submitted = st.form_submit_button("Add Feedback to Batch")
+
+                if submitted:
+                    # Ensure task_id is a string
+                    task_id_str = str(task.id)
+                    feedback_input = {
+                        "task": {"id": task_id_str},
+                        "feedback": {
+                            "task_id": task_id_str,
+                            "actual_duration_minutes": actual_duration,
+                            "estimated_duration_minutes": original_estimate,
+                            "accuracy_feedback": accuracy,
+                            "priority_feedback": priority,
+                            "notes": notes
+                        }
+                    }
+
+                    # Queue the feedback per project (planner IDs repeat across projects), replacing any earlier entry for this task
+                    project_feedback = st.session_state.setdefault("pending_feedback", {}).setdefault(project_id, {})
+                    project_feedback[task_id_str] = feedback_input
+                    st.toast("Feedback added to batch. Submit all pending feedback below.")
+
+                    # Rerun the full app so the pending feedback section outside this fragment updates
+                    st.rerun()
+            else:
+                st.info("Complete the task to provide feedback.")
+
+def render_schedule(schedule, id_to_title):
+    """
+    Render the schedule table and Gantt chart.
+    pandas, numpy and plotly are imported here so the Notes view never loads them.
+    """
+    import numpy as np
+    import pandas as pd
+    import plotly.io as pio
+    
+    if "optimized_schedule" in schedule:
+        schedule_df = pd.DataFrame(schedule["optimized_schedule"])
+        start_times = pd.to_datetime(schedule_df["start_time"], format="ISO8601", cache=True)
+        end_times = pd.to_datetime(schedule_df["end_time"], format="ISO8601", cache=True)
+        task_ids = schedule_df["task_id"].astype(str)
+
+        schedule_df["Task ID"] = schedule_df["task_id"]
+        schedule_df["Task"] = task_ids.map(id_to_title).fillna("Task " + task_ids)
+        schedule_df["Start Time"] = start_times.dt.strftime("%Y-%m-%d %H:%M")
+        schedule_df["End Time"] = end_times.dt.strftime("%Y-%m-%d %H:%M")
+        schedule_df["Duration (min)"] = ((end_times - start_times).dt.total_seconds() / 60).round().astype(int)
+        columns = ["Task ID", "Task", "Start Time", "End Time", "Duration (min)"]
+
+        # Add deadline and status indicator if available
+        if "deadline" in schedule_df:
+            deadlines = pd.to_datetime(schedule_df["deadline"], format="ISO8601", cache=True)
+            buffer_hours = (deadlines - end_times).dt.total_seconds() / 3600
+            status = np.select(
+                [end_times > deadlines, buffer_hours < 24],
+                ["❌ Overdue", "⚠️ Tight deadline"],
+                default="✅ On track"
+            )
+            schedule_df["Deadline"] = deadlines.dt.strftime("%Y-%m-%d %H:%M")
+            schedule_df["Status"] = pd.Series(status, index=schedule_df.index).where(deadlines.notna())
+            columns += ["Deadline", "Status"]
+
+        schedule_df = schedule_df[columns]
+        st.dataframe(schedule_df, key="schedule_dataframe")
+
+        # Generate a Gantt chart visualization (cached on the schedule content)
+        schedule_key = content_digest([schedule["optimized_schedule"], id_to_title])
+        fig = pio.from_json(build_gantt(schedule_key, schedule_df))
+        st.plotly_chart(fig, key="gantt_chart")
+    else:
+        st.write("No schedule data available")
 
 # Define the notes interface
+@st.cache_data(ttl=30, show_spinner=False)
+def load_notes(filter_option):
+    """Load the notes matching a filter option from the database as plain dicts"""
+    assigned = {"Project-specific": True, "Unassigned": False}.get(filter_option)
+    db = SessionLocal()
+    try:
+        return [
+            {"id": note.id, "project_id": note.project_id, "title": note.title, "content": note.content, "tags": note.tags or []}
+            for note in get_notes(db, assigned)
+        ]
+    finally:
+        db.close()
+
+def note_hash(title, content):
+    """Fingerprint of a note's title and content, used to reject duplicate saves"""
+    return hashlib.sha1(f"{title}\0{content}".encode("utf-8")).digest()
+
 def run_notes_interface():
     st.subheader("Create a New Note")
     
@@ -25,69 +420,76 @@ def run_notes_interface():
     note_content = st.text_area("Content", height=200, key="notes_content_input")
     note_tags = st.text_input("Tags (comma-separated)", key="notes_tags_input")
     
-    # Initialize projects if not exists
-    if 'projects' not in st.session_state:
-        st.session_state.projects = {}
-        
-    # Initialize notes if not exists
-    if 'notes' not in st.session_state:
-        st.session_state.notes = {}
+    # Fingerprints of saved notes, seeded from the database once per session
+    if 'notes_hashes' not in st.session_state:
+        st.session_state.notes_hashes = {note_hash(n['title'], n['content']) for n in load_notes("All")}
         
     project_options = ["None"] + list(st.session_state.projects.keys())
     assigned_project = st.selectbox("Assign to Project", options=project_options, key="notes_project_select")
 
     if st.button("Save Note", key="notes_save_button"):
-        if note_title and note_content:
+        if not (note_title and note_content):
+            st.error("Title and content are required.")
+        elif note_hash(note_title, note_content) in st.session_state.notes_hashes:
+            st.warning("A note with this title and content already exists.")
+        else:
             note_data = {
-                "task_id": None if assigned_project == "None" else assigned_project,
+                "project_id": None if assigned_project == "None" else assigned_project,
                 "title": note_title,
                 "content": note_content,
                 "tags": [t.strip() for t in note_tags.split(",") if t.strip()]
             }
-            # Store note in session state
-            note_id = str(uuid.uuid4())
-            st.session_state.notes[note_id] = note_data
-            st.success("Note added successfully")
+            # Store note in the database and drop the cached note lists
+            db = SessionLocal()
+            try:
+                add_note(db, note_data)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Failed to save note: {str(e)}")
+                st.error(f"Failed to save note: {str(e)}")
+            else:
+                st.session_state.notes_hashes.add(note_hash(note_title, note_content))
+                load_notes.clear()
+                st.success("Note added successfully")
 
-            # Reset form
-            st.experimental_rerun()
-        else:
-            st.error("Title and content are required.")
+                # Reset form
+                st.rerun()
+            finally:
+                db.close()
 
     # Note Listing
     st.subheader("View Notes")
     filter_option = st.selectbox("Filter Notes", options=["All", "Project-specific", "Unassigned"], key="notes_filter_select")
 
-    # Filter notes based on selection
-    filtered_notes = {}
-    for note_id, note in st.session_state.notes.items():
-        if filter_option == "All":
-            filtered_notes[note_id] = note
-        elif filter_option == "Project-specific" and note["task_id"] is not None:
-            filtered_notes[note_id] = note
-        elif filter_option == "Unassigned" and note["task_id"] is None:
-            filtered_notes[note_id] = note
+    # Filtering happens in the query, on the indexed project_id column
+    filtered_notes = load_notes(filter_option)
 
     # Display filtered notes
-    for note_id, note in filtered_notes.items():
-        with st.expander(f"{note['title']} (Task ID: {note['task_id']})", key=f"note_expander_{note_id}"):
+    for note in filtered_notes:
+        with st.expander(f"{note['title']} (Project: {note['project_id']})", key=f"note_expander_{note['id']}"):
             st.markdown(note['content'])
             st.write("Tags:", ", ".join(note['tags']) if note['tags'] else "None")
 
+def project_label(pid, description):
+    """Format a project's label for the project selectbox"""
+    return f"{pid}: {description[:50]}..." if len(description) > 50 else f"{pid}: {description}"
+
+def register_project_option(pid, description):
+    """
+    Add a project to the selectbox options kept in session state, replacing its
+    previous label if the project was re-processed with a new description
+    """
+    labels = st.session_state.setdefault("project_labels", {})
+    options = st.session_state.setdefault("project_options", {})
+    if pid in labels:
+        options.pop(labels[pid], None)
+    labels[pid] = project_label(pid, description)
+    options[labels[pid]] = pid
+
 # Define the projects interface
 def run_projects_interface():
     st.header("Project Management")
     
-    # Initialize session state for storing results and projects
-    if 'last_result' not in st.session_state:
-        st.session_state.last_result = None
-    if 'show_results' not in st.session_state:
-        st.session_state.show_results = False
-    if 'projects' not in st.session_state:
-        st.session_state.projects = {}
-    if 'current_project_id' not in st.session_state:
-        st.session_state.current_project_id = None
-
     # Project Selection
     st.subheader("Project Selection")
     
@@ -96,8 +498,7 @@ def run_projects_interface():
     
     with col1:
         if st.session_state.projects:
-            project_options = {f"{pid}: {data['description'][:50]}..." if len(data['description']) > 50 else f"{pid}: {data['description']}": pid 
-                             for pid, data in st.session_state.projects.items()}
+            project_options = st.session_state.project_options
             selected_project = st.selectbox(
                 "Select Existing Project",
                 options=["New Project"] + list(project_options.keys()),
@@ -131,94 +532,126 @@ def run_projects_interface():
     # Project Input
     st.header("Project Details")
     project_description = st.text_area("Project Description", key="project_description_input")
-    constraints = st.text_area("Constraints (one per line)", key="project_constraints_input").split("\n")
+    constraints_text = st.text_area("Constraints (one per line)", key="project_constraints_input")
+    constraints = [c.strip() for c in constraints_text.splitlines() if c.strip()]
 
     if st.button("Process Project", key="process_project_button"):
         if not project_description:
             st.error("Please enter a project description")
             return
 
-        # Create a placeholder for the progress bar
-        progress_placeholder = st.empty()
-        progress_bar = progress_placeholder.progress(0)
+        # Single status container, updated once per phase
+        status = st.status("Processing project...", expanded=True)
+        
+        # Placeholder for streamed LLM output of the running phase
+        stream_placeholder = status.empty()
+        tokens = queue.Queue()
         
-        # Create a status message placeholder
-        status_message = st.empty()
+        # Container for intermediate results rendered as each phase completes
+        preview = st.container()
         
         try:
-            # Initialize agents
-            planner = PlannerAgent()
-            estimator = EstimatorAgent()
-            scheduler = SchedulerAgent()
+            # Get cached agents
+            planner = get_planner()
+            estimator = get_estimator()
+            scheduler = get_scheduler()
+            memory = get_memory()
             
-            # Phase 1: Planning
-            status_message.info("Phase 1/3: Planning tasks...")
-            progress_bar.progress(10)
-            
-            planning_input = {
-                "project_description": project_description,
-                "constraints": constraints
+            # Reuse planning/estimation results for near-duplicate project inputs
+            project_cache = get_project_cache()
+            cache_scope = {
+                "session": st.session_state.setdefault("session_id", uuid.uuid4().hex),
+                "constraints": content_digest(constraints)
             }
-            planning_result = asyncio.get_event_loop().run_until_complete(planner.process(planning_input))
+            cached_results = project_cache.lookup(project_description, cache_scope)
+            schedule_prep = None
             
-            if not planning_result.success:
-                st.error(f"Planning failed: {planning_result.error}")
-                return
+            if cached_results:
+                subtasks, estimates = cached_results
+                subtask_dumps = SUBTASK_LIST.dump_python(subtasks)
+                status.write(f"Reused cached plan for a similar project: {len(subtasks)} subtasks")
+                id_to_title = {str(t.id): t.title for t in subtasks}
+                render_subtasks_preview(preview, subtasks)
+                render_estimates_preview(preview, estimates, id_to_title)
+            else:
+                # Phase 1: Planning
+                status.update(label="Phase 1/3: Planning tasks...")
                 
-            subtasks = planning_result.data["subtasks"]
-            progress_bar.progress(30)
-            status_message.success(f"Planning complete: Generated {len(subtasks)} subtasks")
-            
-            # Phase 2: Estimation
-            status_message.info("Phase 2/3: Estimating task durations...")
-            progress_bar.progress(40)
-            
-            estimation_input = {
-                "tasks": [s.model_dump() for s in subtasks],
-                "historical_data": {}
-            }
-            estimation_result = asyncio.get_event_loop().run_until_complete(estimator.process(estimation_input))
-            
-            if not estimation_result.success:
-                st.error(f"Estimation failed: {estimation_result.error}")
-                return
+                planning_input = {
+                    "project_description": project_description,
+                    "constraints": constraints,
+                    "on_token": tokens.put
+                }
+                planning_result, historical_data = run_async_streaming(
+                    plan_with_history(planner, memory, planning_input), tokens, stream_placeholder
+                )
                 
-            estimates = estimation_result.data["estimates"]
-            progress_bar.progress(60)
-            status_message.success(f"Estimation complete: Generated {len(estimates)} estimates")
+                if not planning_result.success:
+                    status.update(label="Planning failed", state="error")
+                    st.error(f"Planning failed: {planning_result.error}")
+                    return
+                    
+                subtasks = planning_result.data["subtasks"]
+                status.write(f"Planning complete: Generated {len(subtasks)} subtasks")
+                id_to_title = {str(t.id): t.title for t in subtasks}
+                render_subtasks_preview(preview, subtasks)
+                
+                # Phase 2: Estimation
+                status.update(label="Phase 2/3: Estimating task durations...")
+                
+                # Serialize subtasks once, shared by the estimator and scheduler inputs
+                subtask_dumps = SUBTASK_LIST.dump_python(subtasks)
+                estimation_input = {
+                    "tasks": subtask_dumps,
+                    "historical_data": historical_data,
+                    "on_token": tokens.put
+                }
+                estimation_result, schedule_prep = run_async_streaming(
+                    estimate_with_schedule_prep(estimator, scheduler, estimation_input, constraints),
+                    tokens, stream_placeholder
+                )
+                
+                if not estimation_result.success:
+                    status.update(label="Estimation failed", state="error")
+                    st.error(f"Estimation failed: {estimation_result.error}")
+                    return
+                    
+                estimates = estimation_result.data["estimates"]
+                status.write(f"Estimation complete: Generated {len(estimates)} estimates")
+                render_estimates_preview(preview, estimates, id_to_title)
+                
+                project_cache.store(project_description, cache_scope, (subtasks, estimates))
             
             # Phase 3: Scheduling
-            status_message.info("Phase 3/3: Creating optimized schedule...")
-            progress_bar.progress(70)
+            status.update(label="Phase 3/3: Creating optimized schedule...")
             
+            # Serialize estimates once, shared by the scheduler input and persistence
+            estimate_dumps = TASK_ESTIMATE_LIST.dump_python(estimates)
             scheduling_input = {
-                "tasks": [task.model_dump() for task in subtasks],
-                "estimates": [estimate.model_dump() for estimate in estimates],
-                "constraints": constraints
+                "tasks": subtask_dumps,
+                "estimates": estimate_dumps,
+                "constraints": constraints,
+                "prepared": schedule_prep,
+                "on_token": tokens.put
             }
-            scheduling_result = asyncio.get_event_loop().run_until_complete(scheduler.process(scheduling_input))
+            scheduling_result = run_async_streaming(scheduler.process(scheduling_input), tokens, stream_placeholder)
             
             if not scheduling_result.success:
+                status.update(label="Scheduling failed", state="error")
                 st.error(f"Scheduling failed: {scheduling_result.error}")
                 return
                 
-            progress_bar.progress(90)
-            status_message.success("Scheduling complete: Generated optimized schedule")
-            
-            # Final processing
-            progress_bar.progress(100)
-            status_message.success("✅ All processing complete!")
+            # Mark processing complete and notify without blocking
+            status.update(label="Processing complete", state="complete", expanded=False)
+            st.toast("✅ Processing complete", icon="✅")
             
-            # Clear the progress elements after completion
-            time.sleep(1)  # Give users a moment to see the 100% completion
-            progress_placeholder.empty()
-            status_message.empty()
-            
-            # Store the results
+            # Store the results, with lookup maps built once per project rather than per rerun
             results = {
                 "subtasks": subtasks,
                 "estimates": estimates,
-                "schedule": scheduling_result.data
+                "schedule": scheduling_result.data,
+                "id_to_title": id_to_title,
+                "id_to_estimate": {str(e.task_id): e for e in estimates}
             }
             
             # Generate a unique project ID if this is a new project
@@ -233,14 +666,26 @@ def run_projects_interface():
                 "created_at": datetime.now().isoformat()
             }
             
+            register_project_option(st.session_state.current_project_id, project_description)
+            
             st.session_state.last_result = results
             st.session_state.show_results = True
             
+            # Persist to the database in the background and track its status
+            persist_future = get_persistence_executor().submit(
+                persist_project,
+                st.session_state.current_project_id,
+                subtask_dumps,
+                estimate_dumps
+            )
+            st.session_state.setdefault("processing_status", {})[st.session_state.current_project_id] = persist_future
+            
             # Force a rerun to show the results
             st.rerun()
 
         except Exception as e:
             logger.error(f"Error in main processing: {str(e)}")
+            status.update(label="Processing failed", state="error")
             st.error(f"An error occurred: {str(e)}")
 
     # Display Results if available
@@ -250,241 +695,92 @@ def run_projects_interface():
         # Add a save button for the current project
         if st.session_state.current_project_id:
             if st.button("Save Project", key="save_project_button"):
-                st.success("Project saved successfully!")
+                persist_future = st.session_state.get("processing_status", {}).get(st.session_state.current_project_id)
+                if persist_future is None:
+                    st.warning("Project has no saved results yet")
+                elif not persist_future.done():
+                    st.info("Project is still being saved...")
+                elif persist_future.exception():
+                    st.error(f"Failed to save project: {persist_future.exception()}")
+                else:
+                    st.success("Project saved successfully!")
         
         subtasks = st.session_state.last_result["subtasks"]
         estimates = st.session_state.last_result["estimates"]
         schedule = st.session_state.last_result["schedule"]
 
+        # Lookup maps built when the results were stored, so per-task lookups are O(1)
+        id_to_title = st.session_state.last_result["id_to_title"]
+        id_to_estimate = st.session_state.last_result["id_to_estimate"]
+
         # Subtasks
+        project_id = st.session_state.current_project_id
         st.subheader("Subtasks")
         for idx, task in enumerate(subtasks):
-            # Initialize task completion state if not exists
-            task_key = f"task_completed_{task.id}_{idx}"
-            if task_key not in st.session_state:
-                st.session_state[task_key] = False
-            
-            # Create columns for checkbox and expander
-            col1, col2 = st.columns([1, 20])
-            
-            with col1:
-                # Checkbox for task completion
-                is_completed = st.checkbox(
-                    "✓",
-                    value=st.session_state[task_key],
-                    key=f"checkbox_{task.id}_{idx}",
-                    help="Mark task as completed"
-                )
-                st.session_state[task_key] = is_completed
-            
-            with col2:
-                # Task expander with completion status
-                expander_title = f"**{task.title}** {'✅' if is_completed else ''}"
-                with st.expander(expander_title, key=f"task_expander_{task.id}_{idx}"):
-                    st.write(f"Description: {task.description}")
-                    st.write(f"Dependencies: {', '.join(map(str, task.dependencies))}")
-                    st.write(f"Priority: {task.priority}/5")
-                    
-                    # Find the estimate for this task
-                    task_estimate = next((e for e in estimates if str(e.task_id) == str(task.id)), None)
-                    if task_estimate:
-                        st.write(f"Estimated Duration: {task_estimate.estimated_duration_minutes} minutes")
-                        st.write(f"Confidence: {task_estimate.confidence_score:.2f}")
-                    
-                    # Only show feedback form if task is completed
-                    if is_completed:
-                        st.write("---")
-                        st.subheader("Task Feedback")
-                        
-                        # Feedback inputs
-                        actual_duration = st.number_input(
-                            "Actual Duration (minutes)", 
-                            min_value=0, 
-                            max_value=1440, 
-                            value=task_estimate.estimated_duration_minutes if task_estimate else 60,
-                            key=f"duration_input_{task.id}_{idx}"
-                        )
-                        
-                        # Calculate default values
-                        original_estimate = task_estimate.estimated_duration_minutes if task_estimate else 0
-                        accuracy_default = min(1.0, max(0.0, 1.0 - abs(original_estimate - actual_duration) / max(original_estimate, 1)))
-                        
-                        # Feedback metrics
-                        accuracy = st.slider(
-                            "Accuracy Feedback (0-1)", 
-                            0.0, 1.0, 
-                            accuracy_default,
-                            key=f"accuracy_slider_{task.id}_{idx}"
-                        )
-                        priority = st.slider(
-                            "Priority Feedback (0-1)", 
-                            0.0, 1.0, 
-                            0.5,
-                            key=f"priority_slider_{task.id}_{idx}"
-                        )
-                        notes = st.text_area(
-                            "Notes",
-                            key=f"notes_input_{task.id}_{idx}"
+            render_task(task, idx, id_to_estimate, project_id)
+
+        # Pending feedback batch for this project
+        pending_feedback = st.session_state.get("pending_feedback", {}).get(project_id, {})
+        if pending_feedback:
+            st.subheader("Pending Feedback")
+            if st.button(f"Submit Feedback ({len(pending_feedback)} tasks)", key="submit_feedback_batch"):
+                with st.spinner("Processing feedback..."):
+                    try:
+                        memory = get_memory()
+                        feedback_inputs = list(pending_feedback.values())
+                        batch_results = run_async(
+                            process_feedback_batch(memory, feedback_inputs)
                         )
+                        st.session_state.pending_feedback.pop(project_id, None)
                         
-                        if st.button("Submit Feedback", key=f"submit_feedback_{task.id}_{idx}"):
-                            # Ensure task_id is a string
-                            task_id_str = str(task.id)
-                            feedback_input = {
-                                "task": {"id": task_id_str},
-                                "feedback": {
-                                    "task_id": task_id_str,
-                                    "actual_duration_minutes": actual_duration,
-                                    "estimated_duration_minutes": original_estimate,
-                                    "accuracy_feedback": accuracy,
-                                    "priority_feedback": priority,
-                                    "notes": notes
-                                }
-                            }
-                            
-                            with st.spinner("Processing feedback..."):
-                                try:
-                                    memory = MemoryAgent()
-                                    result = asyncio.get_event_loop().run_until_complete(memory.process(feedback_input))
-                                    
-                                    if result.success:
-                                        st.success("Feedback submitted successfully!")
-                                        
-                                        # Display analysis if available
-                                        if "analysis" in result.data:
-                                            st.subheader("Feedback Analysis")
-                                            if isinstance(result.data["analysis"], dict):
-                                                # Display estimation accuracy
-                                                if "estimation_accuracy" in result.data["analysis"]:
-                                                    accuracy = result.data["analysis"]["estimation_accuracy"]
-                                                    st.write("### Estimation Accuracy")
-                                                    st.write(f"**Score**: {accuracy.get('score', 'N/A')}")
-                                                    st.write(f"**Analysis**: {accuracy.get('analysis', 'No analysis available')}")
-                                                    st.write("**Suggestions**:")
-                                                    for suggestion in accuracy.get('suggestions', []):
-                                                        st.write(f"- {suggestion}")
-                                                    st.write("---")
-                                                
-                                                # Display task patterns
-                                                if "task_patterns" in result.data["analysis"]:
-                                                    patterns = result.data["analysis"]["task_patterns"]
-                                                    st.write("### Task Patterns")
-                                                    st.write(f"**Duration Patterns**: {patterns.get('duration_patterns', 'No patterns identified')}")
-                                                    st.write(f"**Priority Patterns**: {patterns.get('priority_patterns', 'No patterns identified')}")
-                                                    st.write("**Common Issues**:")
-                                                    for issue in patterns.get('common_issues', []):
-                                                        st.write(f"- {issue}")
-                                                    st.write("---")
-                                                
-                                                # Display recommendations
-                                                if "recommendations" in result.data["analysis"]:
-                                                    recs = result.data["analysis"]["recommendations"]
-                                                    st.write("### Recommendations")
-                                                    
-                                                    st.write("**Estimation Improvements**:")
-                                                    for improvement in recs.get('estimation_improvements', []):
-                                                        st.write(f"- {improvement}")
-                                                    
-                                                    st.write("**Priority Adjustments**:")
-                                                    for adjustment in recs.get('priority_adjustments', []):
-                                                        st.write(f"- {adjustment}")
-                                                    
-                                                    st.write("**General Suggestions**:")
-                                                    for suggestion in recs.get('general_suggestions', []):
-                                                        st.write(f"- {suggestion}")
-                                            else:
-                                                st.write(result.data["analysis"])
-                                    else:
-                                        st.error(f"Error: {result.error}")
-                                except Exception as e:
-                                    logger.error(f"Error in feedback processing: {str(e)}")
-                                    st.error(f"An error occurred while processing feedback: {str(e)}")
-                    else:
-                        st.info("Complete the task to provide feedback.")
+                        for feedback_input, result in zip(feedback_inputs, batch_results):
+                            task_id_str = feedback_input["task"]["id"]
+                            task_title = id_to_title.get(task_id_str, f"Task {task_id_str}")
+                            if result.success:
+                                st.success(f"Feedback submitted successfully for {task_title}!")
+                                
+                                # Display analysis if available
+                                if "analysis" in result.data:
+                                    with st.expander(f"Feedback Analysis: {task_title}"):
+                                        render_feedback_analysis(result.data["analysis"])
+                            else:
+                                st.error(f"Error for {task_title}: {result.error}")
+                    except Exception as e:
+                        logger.error(f"Error in feedback processing: {str(e)}")
+                        st.error(f"An error occurred while processing feedback: {str(e)}")
 
         # Schedule
         st.subheader("Optimized Schedule")
-        if "optimized_schedule" in schedule:
-            schedule_data = []
-            for task in schedule["optimized_schedule"]:
-                task_id = task["task_id"]
-                task_title = next((t.title for t in subtasks if str(t.id) == str(task_id)), f"Task {task_id}")
-                start_time = datetime.fromisoformat(task["start_time"])
-                end_time = datetime.fromisoformat(task["end_time"])
-                duration = (end_time - start_time).total_seconds() / 60
-                
-                schedule_item = {
-                    "Task ID": task_id,
-                    "Task": task_title,
-                    "Start Time": start_time.strftime("%Y-%m-%d %H:%M"),
-                    "End Time": end_time.strftime("%Y-%m-%d %H:%M"),
-                    "Duration (min)": round(duration)
-                }
-                
-                # Add deadline if available
-                if "deadline" in task:
-                    deadline = datetime.fromisoformat(task["deadline"])
-                    schedule_item["Deadline"] = deadline.strftime("%Y-%m-%d %H:%M")
-                    
-                    # Add a status indicator based on deadline
-                    if end_time > deadline:
-                        schedule_item["Status"] = "❌ Overdue"
-                    else:
-                        buffer = (deadline - end_time).total_seconds() / 3600  # hours
-                        if buffer < 24:
-                            schedule_item["Status"] = "⚠️ Tight deadline"
-                        else:
-                            schedule_item["Status"] = "✅ On track"
-                
-                schedule_data.append(schedule_item)
-            
-            schedule_df = pd.DataFrame(schedule_data)
-            st.dataframe(schedule_df, key="schedule_dataframe")
-            
-            # Generate a Gantt chart visualization
-            fig = px.timeline(
-                schedule_data, 
-                x_start="Start Time", 
-                x_end="End Time", 
-                y="Task",
-                color="Status" if any("Status" in item for item in schedule_data) else "Task",
-                title="Task Schedule Gantt Chart"
-            )
-            
-            # Add deadline markers if available
-            if any("Deadline" in item for item in schedule_data):
-                for task in schedule_data:
-                    if "Deadline" in task:
-                        fig.add_vline(
-                            x=task["Deadline"], 
-                            line_dash="dash", 
-                            line_color="red",
-                            annotation_text=f"Deadline: {task['Task']}"
-                        )
-            
-            fig.update_yaxes(autorange="reversed")
-            st.plotly_chart(fig, key="gantt_chart")
-        else:
-            st.write("No schedule data available")
+        render_schedule(schedule, id_to_title)
 
 # Main application entry point
 def main():
     # Set page configuration
     st.set_page_config(page_title="Autonomous Task Agent System", layout="wide")
 
+    # One-time initialization, cached across reruns and sessions
+    try:
+        bootstrap_app()
+    except Exception as e:
+        logger.error(f"Failed to initialize application: {str(e)}")
+        st.error(f"Failed to initialize application: {str(e)}")
+        st.stop()
+
     # Main title
     st.title("📝 NoteDesk: Your Smart Productivity Workspace")
 
     # Sidebar for mode selection
     app_mode = st.sidebar.radio("Select Mode", ["🗒️ Notes", "📁 Projects"], key="mode_select")
 
-    # Ensure projects are initialized in session state
-    if 'projects' not in st.session_state:
-        st.session_state.projects = {}
-
-    # Ensure notes are initialized in session state
-    if 'notes' not in st.session_state:
-        st.session_state.notes = {}
+    # Initialize session state for storing results and projects, in one place for both interfaces
+    for key, default in (
+        ("projects", {}),
+        ("last_result", None),
+        ("show_results", False),
+        ("current_project_id", None),
+        ("project_options", {}),
+    ):
+        st.session_state.setdefault(key, default)
 
     # Run the appropriate interface based on selection
     if app_mode == "🗒️ Notes":
@@ -494,44 +790,5 @@ def main():
 
 
 if __name__ == "__main__":
-    # Initialize the application
-    if not initialize_app():
-        logger.error("Failed to initialize application. Exiting...")
-        st.error("Failed to initialize application")
-        st.stop()
-    else:
-        logger.info("Application initialized successfully")
-
-    # Initialize database
-    try:
-        init_db()
-        logger.info("Database initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize database: {str(e)}")
-        st.error(f"Failed to initialize database: {str(e)}")
-        st.stop()
-
-    # Patch the event loop for Streamlit
-    try:
-        nest_asyncio.apply()
-        logger.info("Successfully patched event loop with nest_asyncio")
-    except Exception as e:
-        logger.error(f"Failed to patch event loop: {str(e)}")
-        st.error(f"Failed to initialize application: {str(e)}")
-        st.stop()
-
-    # Initialize agents
-    try:
-        # Initialize agents globally to check they work
-        PlannerAgent()
-        EstimatorAgent()
-        SchedulerAgent()
-        MemoryAgent()
-        logger.info("Successfully initialized all agents")
-    except Exception as e:
-        logger.error(f"Failed to initialize agents: {str(e)}")
-        st.error(f"Failed to initialize application: {str(e)}")
-        st.stop()
-
-    # Run the application
-    main()
\ No newline at end of file
+    # Run the application; agents are built lazily by their cached factories
+    main()
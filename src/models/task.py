@@ -5,6 +5,10 @@ from datetime import datetime, timezone
 
 Base = declarative_base()
 
+def utc_now():
+    """Current UTC time, passed as a callable default so it is evaluated per row"""
+    return datetime.now(timezone.utc)
+
 class Task(Base):
     __tablename__ = "tasks"
     
@@ -13,8 +17,8 @@ class Task(Base):
     description = Column(String)
     dependencies = Column(JSON)  # List of task IDs
     priority = Column(Integer)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utc_now)
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
     
     # Relationships
     estimates = relationship("TaskEstimate", back_populates="task")
@@ -25,11 +29,11 @@ class TaskEstimate(Base):
     __tablename__ = "task_estimates"
     
     id = Column(Integer, primary_key=True)
-    task_id = Column(String, ForeignKey("tasks.id"))
+    task_id = Column(String, ForeignKey("tasks.id"), index=True)
     estimated_duration_minutes = Column(Integer)
     confidence_score = Column(Float)
     historical_data_used = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utc_now)
     
     # Relationships
     task = relationship("Task", back_populates="estimates")
@@ -38,13 +42,13 @@ class TaskFeedback(Base):
     __tablename__ = "task_feedback"
     
     id = Column(Integer, primary_key=True)
-    task_id = Column(String, ForeignKey("tasks.id"))
+    task_id = Column(String, ForeignKey("tasks.id"), index=True)
     actual_duration_minutes = Column(Integer)
     estimated_duration_minutes = Column(Integer)
     accuracy_feedback = Column(Float)
     priority_feedback = Column(Float)
     notes = Column(String)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utc_now)
     
     # Relationships
     task = relationship("Task", back_populates="feedback")
@@ -53,12 +57,13 @@ class Note(Base):
     __tablename__ = "notes"
     
     id = Column(Integer, primary_key=True)
-    task_id = Column(String, ForeignKey("tasks.id"))
+    task_id = Column(String, ForeignKey("tasks.id"), index=True)
+    project_id = Column(String, index=True)  # Project the note is assigned to, if any
     title = Column(String, nullable=False)
     content = Column(String, nullable=False)
     tags = Column(JSON)  # List of tag strings
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=utc_now)
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
     
     # Relationships
     task = relationship("Task", back_populates="notes") 
\ No newline at end of file
@@ -2,57 +2,118 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+import google_auth_httplib2
+import httplib2
+import asyncio
 import os
-import pickle
+import tempfile
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
-from dotenv import load_dotenv
 from src.utils.logging import logger
 
-load_dotenv()
-
-# If modifying these scopes, delete the file token.pickle.
+# If modifying these scopes, delete the file token.json.
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
+# Maximum number of requests Google accepts in a single batch
+MAX_BATCH_SIZE = 50
+
+# Socket timeout, in seconds, for the shared Calendar HTTP connection
+HTTP_TIMEOUT = 30
+
+def _resolve_credentials_path():
+    """Find the credentials file named by GOOGLE_CALENDAR_CREDENTIALS, or None if it is missing"""
+    credentials_path = os.getenv('GOOGLE_CALENDAR_CREDENTIALS')
+    
+    logger.debug(f"Looking for credentials file at: {credentials_path}")
+    logger.debug(f"Current working directory: {os.getcwd()}")
+    
+    if not credentials_path:
+        logger.warning("GOOGLE_CALENDAR_CREDENTIALS environment variable not set")
+        logger.info("Please set GOOGLE_CALENDAR_CREDENTIALS in your .env file to point to your credentials.json file")
+        return None
+        
+    # Try multiple possible locations for the credentials file
+    possible_paths = [
+        credentials_path,  # Original path
+        os.path.join(os.getcwd(), credentials_path),  # Relative to current directory
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), credentials_path),  # Relative to this file
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), credentials_path)  # Relative to src directory
+    ]
+    
+    for path in possible_paths:
+        logger.debug(f"Trying path: {path}")
+        if os.path.exists(path):
+            logger.debug(f"Found credentials file at: {path}")
+            return path
+    
+    logger.warning(f"Credentials file not found at any of these locations: {possible_paths}")
+    logger.info("Please make sure your credentials.json file is in one of these locations:")
+    for path in possible_paths:
+        logger.info(f"- {path}")
+    return None
+
+# Resolved once at import rather than on every service build
+_CREDENTIALS_PATH = _resolve_credentials_path()
+
+# Shared service, built on first use so every caller reuses one authorized keep-alive connection,
+# and rebuilt only once its credentials are no longer valid. The (service, credentials) pair is
+# swapped in as one tuple so the lock-free fast path never sees one without the other.
+_service_state = None
+_service_lock = threading.Lock()
+
 def get_calendar_service():
-    """Get an authorized Google Calendar service instance"""
+    """Get the shared authorized Google Calendar service instance, building it on first use"""
+    global _service_state
+    state = _service_state
+    if state is not None and state[1].valid:
+        return state[0]
+    with _service_lock:
+        if _service_state is None or not _service_state[1].valid:
+            _service_state = _build_calendar_service()
+        return _service_state[0] if _service_state else None
+
+# httplib2 connections are not thread-safe, so each thread making requests keeps its own
+_thread_local = threading.local()
+
+def _thread_http():
+    """
+    Get this thread's authorized keep-alive connection for the shared credentials,
+    or None to fall back to the service's own connection
+    """
+    state = _service_state
+    if state is None:
+        return None
+    credentials = state[1]
+    http = getattr(_thread_local, "http", None)
+    if http is None or http.credentials is not credentials:
+        http = google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+        _thread_local.http = http
+    return http
+
+def _save_token(creds, token_path):
+    """Write credentials as JSON atomically, so a crash mid-write cannot corrupt the token file"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(token_path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as token:
+            token.write(creds.to_json())
+        os.replace(tmp_path, token_path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+def _build_calendar_service():
+    """Build an authorized Google Calendar service instance, returned with its credentials"""
     try:
         creds = None
-        credentials_path = os.getenv('GOOGLE_CALENDAR_CREDENTIALS')
-        
-        logger.debug(f"Looking for credentials file at: {credentials_path}")
-        logger.debug(f"Current working directory: {os.getcwd()}")
-        
+        credentials_path = _CREDENTIALS_PATH
         if not credentials_path:
-            logger.warning("GOOGLE_CALENDAR_CREDENTIALS environment variable not set")
-            logger.info("Please set GOOGLE_CALENDAR_CREDENTIALS in your .env file to point to your credentials.json file")
             return None
-            
-        # Try multiple possible locations for the credentials file
-        possible_paths = [
-            credentials_path,  # Original path
-            os.path.join(os.getcwd(), credentials_path),  # Relative to current directory
-            os.path.join(os.path.dirname(os.path.abspath(__file__)), credentials_path),  # Relative to this file
-            os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), credentials_path)  # Relative to src directory
-        ]
         
-        for path in possible_paths:
-            logger.debug(f"Trying path: {path}")
-            if os.path.exists(path):
-                credentials_path = path
-                logger.debug(f"Found credentials file at: {credentials_path}")
-                break
-        else:
-            logger.warning(f"Credentials file not found at any of these locations: {possible_paths}")
-            logger.info("Please make sure your credentials.json file is in one of these locations:")
-            for path in possible_paths:
-                logger.info(f"- {path}")
-            return None
-        
-        # The file token.pickle stores the user's access and refresh tokens
-        token_path = os.path.join(os.path.dirname(credentials_path), 'token.pickle')
+        # The file token.json stores the user's access and refresh tokens
+        token_path = os.path.join(os.path.dirname(credentials_path), 'token.json')
         if os.path.exists(token_path):
-            with open(token_path, 'rb') as token:
-                creds = pickle.load(token)
+            creds = Credentials.from_authorized_user_file(token_path, SCOPES)
         
         # If there are no (valid) credentials available, let the user log in.
         if not creds or not creds.valid:
@@ -63,73 +124,170 @@ def get_calendar_service():
                     credentials_path, SCOPES)
                 creds = flow.run_local_server(port=0)
             # Save the credentials for the next run
-            with open(token_path, 'wb') as token:
-                pickle.dump(creds, token)
+            _save_token(creds, token_path)
         
-        return build('calendar', 'v3', credentials=creds)
+        authed_http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+        # Use the discovery document bundled with the client library instead of fetching it
+        service = build('calendar', 'v3', http=authed_http, static_discovery=True, cache_discovery=False)
+        return service, creds
     except Exception as e:
         logger.error(f"Error initializing calendar service: {str(e)}")
         return None
 
-def create_calendar_event(service, task, start_time, end_time):
-    """Create a calendar event for a task"""
+def _build_event_body(task, start_time, end_time):
+    """Build the calendar event body for a task"""
+    return {
+        'summary': task.title,
+        'description': task.description,
+        'start': {
+            'dateTime': start_time.isoformat(),
+            'timeZone': 'UTC',
+        },
+        'end': {
+            'dateTime': end_time.isoformat(),
+            'timeZone': 'UTC',
+        },
+    }
+
+def _log_batch_error(request_id, response, exception):
+    """Default batch callback, logs failed requests"""
+    if exception is not None:
+        logger.error(f"Error in batched calendar request {request_id}: {str(exception)}")
+
+class CalendarBatch:
+    """Queue calendar requests and send them in batches of at most MAX_BATCH_SIZE"""
+    
+    def __init__(self, service, callback=None):
+        self._service = service
+        self._callback = callback or _log_batch_error
+        self._batch = None
+        self._size = 0
+    
+    def add(self, request, request_id=None, callback=None):
+        """Queue a request, sending the batch once it is full"""
+        if self._batch is None:
+            self._batch = self._service.new_batch_http_request(callback=self._callback)
+        self._batch.add(request, callback=callback, request_id=request_id)
+        self._size += 1
+        if self._size >= MAX_BATCH_SIZE:
+            self.flush()
+    
+    def flush(self):
+        """Send any queued requests"""
+        if self._batch is None:
+            return
+        batch, self._batch, self._size = self._batch, None, 0
+        try:
+            batch.execute(http=_thread_http())
+        except Exception as e:
+            logger.error(f"Error executing calendar batch: {str(e)}")
+
+@contextmanager
+def calendar_batch(service, callback=None):
+    """
+    Batch calendar requests made inside the block, e.g.
+    
+        with calendar_batch(service) as batch:
+            create_calendar_event(service, task, start_time, end_time, batch=batch)
+    
+    Full batches are sent as they fill up and the remainder is sent on exit.
+    """
+    batch = CalendarBatch(service, callback)
+    try:
+        yield batch
+    finally:
+        batch.flush()
+
+def create_calendar_event(service, task, start_time, end_time, batch=None):
+    """Create a calendar event for a task, or queue it on batch if given"""
     if not service:
         logger.warning("Calendar service not available")
         return None
         
     try:
-        event = {
-            'summary': task.title,
-            'description': task.description,
-            'start': {
-                'dateTime': start_time.isoformat(),
-                'timeZone': 'UTC',
-            },
-            'end': {
-                'dateTime': end_time.isoformat(),
-                'timeZone': 'UTC',
-            },
-        }
-        
-        event = service.events().insert(calendarId='primary', body=event).execute()
-        return event
+        event = _build_event_body(task, start_time, end_time)
+        request = service.events().insert(calendarId='primary', body=event)
+        if batch is not None:
+            batch.add(request)
+            return None
+        return request.execute(http=_thread_http())
     except Exception as e:
         logger.error(f"Error creating calendar event: {str(e)}")
         return None
 
-def update_calendar_event(service, event_id, task, start_time, end_time):
-    """Update an existing calendar event"""
+def create_calendar_events(service, items):
+    """
+    Create calendar events for many tasks using batched requests,
+    one HTTP round trip per MAX_BATCH_SIZE events instead of one per event.
+    
+    Args:
+        service: Authorized Google Calendar service
+        items: Iterable of (task, start_time, end_time) tuples
+        
+    Returns:
+        List of created events in input order, with None for any that failed
+    """
+    if not service:
+        logger.warning("Calendar service not available")
+        return []
+    
+    items = list(items)
+    created_events = [None] * len(items)
+    
+    def handle_response(request_id, response, exception):
+        if exception is not None:
+            logger.error(f"Error creating calendar event: {str(exception)}")
+        else:
+            created_events[int(request_id)] = response
+    
+    with calendar_batch(service, callback=handle_response) as batch:
+        for index, (task, start_time, end_time) in enumerate(items):
+            event = _build_event_body(task, start_time, end_time)
+            batch.add(service.events().insert(calendarId='primary', body=event), request_id=str(index))
+    
+    return created_events
+
+def update_calendar_event(service, event_id, task, start_time, end_time, batch=None):
+    """Update an existing calendar event, or queue the update on batch if given"""
     if not service:
         logger.warning("Calendar service not available")
         return None
         
     try:
-        event = service.events().get(calendarId='primary', eventId=event_id).execute()
+        event = service.events().get(calendarId='primary', eventId=event_id).execute(http=_thread_http())
         
         event['summary'] = task.title
         event['description'] = task.description
         event['start']['dateTime'] = start_time.isoformat()
         event['end']['dateTime'] = end_time.isoformat()
         
-        updated_event = service.events().update(
+        request = service.events().update(
             calendarId='primary',
             eventId=event_id,
             body=event
-        ).execute()
+        )
+        if batch is not None:
+            batch.add(request)
+            return None
         
+        updated_event = request.execute(http=_thread_http())
         return updated_event
     except Exception as e:
         logger.error(f"Error updating calendar event: {str(e)}")
         return None
 
-def delete_calendar_event(service, event_id):
-    """Delete a calendar event"""
+def delete_calendar_event(service, event_id, batch=None):
+    """Delete a calendar event, or queue the deletion on batch if given"""
     if not service:
         logger.warning("Calendar service not available")
         return
         
     try:
-        service.events().delete(calendarId='primary', eventId=event_id).execute()
+        request = service.events().delete(calendarId='primary', eventId=event_id)
+        if batch is not None:
+            batch.add(request)
+        else:
+            request.execute(http=_thread_http())
     except Exception as e:
         logger.error(f"Error deleting calendar event: {str(e)}")
 
@@ -140,10 +298,12 @@ def get_calendar_events(service, time_min=None, time_max=None):
         return []
         
     try:
+        # RFC 3339 UTC timestamps; isoformat() already ends in +00:00, so appending 'Z' was invalid
+        now = datetime.now(timezone.utc)
         if time_min is None:
-            time_min = datetime.now(timezone.utc).isoformat() + 'Z'
+            time_min = now.strftime('%Y-%m-%dT%H:%M:%SZ')
         if time_max is None:
-            time_max = (datetime.now(timezone.utc) + timedelta(days=7)).isoformat() + 'Z'
+            time_max = (now + timedelta(days=7)).strftime('%Y-%m-%dT%H:%M:%SZ')
         
         events_result = service.events().list(
             calendarId='primary',
@@ -151,9 +311,32 @@ def get_calendar_events(service, time_min=None, time_max=None):
             timeMax=time_max,
             singleEvents=True,
             orderBy='startTime'
-        ).execute()
+        ).execute(http=_thread_http())
         
         return events_result.get('items', [])
     except Exception as e:
         logger.error(f"Error fetching calendar events: {str(e)}")
-        return [] 
\ No newline at end of file
+        return [] 
+
+# Async variants for use on an event loop. Each runs the blocking helper in a worker thread
+# with its own connection, so independent calls can be awaited together with asyncio.gather.
+
+async def create_calendar_event_async(service, task, start_time, end_time):
+    """Create a calendar event for a task without blocking the event loop"""
+    return await asyncio.to_thread(create_calendar_event, service, task, start_time, end_time)
+
+async def create_calendar_events_async(service, items):
+    """Create batched calendar events for many tasks without blocking the event loop"""
+    return await asyncio.to_thread(create_calendar_events, service, items)
+
+async def update_calendar_event_async(service, event_id, task, start_time, end_time):
+    """Update an existing calendar event without blocking the event loop"""
+    return await asyncio.to_thread(update_calendar_event, service, event_id, task, start_time, end_time)
+
+async def delete_calendar_event_async(service, event_id):
+    """Delete a calendar event without blocking the event loop"""
+    return await asyncio.to_thread(delete_calendar_event, service, event_id)
+
+async def get_calendar_events_async(service, time_min=None, time_max=None):
+    """Get calendar events within a time range without blocking the event loop"""
+    return await asyncio.to_thread(get_calendar_events, service, time_min, time_max)
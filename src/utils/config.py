@@ -1,26 +1,25 @@
 import os
-from dotenv import load_dotenv
-from pydantic_settings import BaseSettings
+import logging
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from src.utils.logging import logger
 
-load_dotenv()
-
 class Settings(BaseSettings):
     # Mistral Configuration
-    MISTRAL_API_KEY: str = os.getenv("MISTRAL_API_KEY", "")
+    MISTRAL_API_KEY: str = ""
     
     # Google Calendar Configuration
-    GOOGLE_CALENDAR_CREDENTIALS: str = os.getenv("GOOGLE_CALENDAR_CREDENTIALS", "")
+    GOOGLE_CALENDAR_CREDENTIALS: str = ""
     
     # Database Configuration
-    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./task_agent.db")
+    DATABASE_URL: str = "sqlite:///./task_agent.db"
     
     # Vector Database Configuration
-    CHROMA_DB_PATH: str = os.getenv("CHROMA_DB_PATH", ".chroma")
+    CHROMA_DB_PATH: str = ".chroma"
     
     # Application Settings
-    DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    DEBUG: bool = False
+    LOG_LEVEL: str = "INFO"
     
     # Agent Settings
     PLANNER_AGENT_MODEL: str = "mistral-large-latest"
@@ -37,19 +36,20 @@ class Settings(BaseSettings):
     FEEDBACK_REMINDER_HOURS: int = 24
     MIN_FEEDBACK_SAMPLES: int = 5
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
-
-# Create settings instance
-settings = Settings()
+    # Values come from the environment or .env, read once when Settings() is constructed
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True, extra="ignore")
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Get the application settings"""
-    return settings
+    """
+    Get the application settings, loaded on first use.
+    Call get_settings.cache_clear() to reload them, e.g. after changing the environment.
+    """
+    return Settings()
 
 def validate_settings():
     """Validate that all required settings are present"""
+    settings = get_settings()
     missing_settings = []
     
     if not settings.MISTRAL_API_KEY:
@@ -57,9 +57,11 @@ def validate_settings():
     
     if not settings.GOOGLE_CALENDAR_CREDENTIALS:
         missing_settings.append("GOOGLE_CALENDAR_CREDENTIALS")
-        logger.debug(f"Environment variables: {dict(os.environ)}")
-        logger.debug(f"Current working directory: {os.getcwd()}")
-        logger.debug(f"Files in directory: {os.listdir('.')}")
+        # Only gather the environment and directory listing when debug logging is on
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Environment variables: %s", dict(os.environ))
+            logger.debug("Current working directory: %s", os.getcwd())
+            logger.debug("Files in directory: %s", os.listdir('.'))
     
     if missing_settings:
         raise ValueError(
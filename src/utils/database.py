@@ -1,27 +1,64 @@
-from sqlalchemy import create_engine, Table, Column, Integer, String, MetaData, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, inspect, Table, Column, Integer, String, MetaData, text
+from sqlalchemy.orm import sessionmaker, selectinload
 from sqlalchemy.ext.declarative import declarative_base
-from src.models.task import Base
+from src.models.task import Base, Task, TaskEstimate, TaskFeedback, Note
 import os
-from dotenv import load_dotenv
 from src.utils.logging import logger
 
-load_dotenv()
-
 # Get database URL from environment variables
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./task_agent.db")
 
 # Create engine
-engine = create_engine(DATABASE_URL)
+if DATABASE_URL.startswith("sqlite"):
+    # Sessions are also used from background persistence threads
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers proceed while a write is in progress
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+else:
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=20,
+        max_overflow=40,
+        pool_pre_ping=True,
+        pool_recycle=1800
+    )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Statements used by init_db, built once at import with bound parameters
+_COUNT_TENANTS = text("SELECT COUNT(*) FROM tenants")
+_INSERT_TENANT = text("INSERT INTO tenants (id, name) VALUES (:id, :name)")
+
+def _migrate_existing_schema():
+    """
+    Add the nullable columns and indexes declared on the models that are missing from tables
+    created by an older schema, since create_all only creates whole tables
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                    logger.info(f"Added column {table.name}.{column.name}")
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
 def init_db():
     """Initialize the database by creating all tables"""
     try:
         # Create tables defined in Base models
         Base.metadata.create_all(bind=engine)
+        _migrate_existing_schema()
         
         # Define and create the tenants table explicitly
         metadata = MetaData()
@@ -37,10 +74,9 @@ def init_db():
         # Create default tenant if needed
         db = SessionLocal()
         try:
-            # Use text() for raw SQL
-            result = db.execute(text("SELECT COUNT(*) FROM tenants")).scalar()
+            result = db.execute(_COUNT_TENANTS).scalar()
             if result == 0:
-                db.execute(text("INSERT INTO tenants (id, name) VALUES (1, 'default')"))
+                db.execute(_INSERT_TENANT, {"id": 1, "name": "default"})
                 db.commit()
         except Exception as e:
             db.rollback()
@@ -63,7 +99,6 @@ def get_db():
 
 def add_task(db, task_data):
     """Add a new task to the database"""
-    from src.models.task import Task  # Fixed import path
     task = Task(**task_data)
     db.add(task)
     db.commit()
@@ -72,7 +107,6 @@ def add_task(db, task_data):
 
 def add_task_estimate(db, estimate_data):
     """Add a new task estimate to the database"""
-    from src.models.task import TaskEstimate  # Fixed import path
     estimate = TaskEstimate(**estimate_data)
     db.add(estimate)
     db.commit()
@@ -81,31 +115,48 @@ def add_task_estimate(db, estimate_data):
 
 def add_task_feedback(db, feedback_data):
     """Add new task feedback to the database"""
-    from src.models.task import TaskFeedback  # Fixed import path
     feedback = TaskFeedback(**feedback_data)
     db.add(feedback)
     db.commit()
     db.refresh(feedback)
     return feedback
 
+def bulk_add_task_estimates(db, estimates_data):
+    """Add many task estimates in a single executemany INSERT and commit"""
+    db.bulk_insert_mappings(TaskEstimate, estimates_data)
+    db.commit()
+
+def bulk_add_task_feedback(db, feedback_data):
+    """Add many task feedback rows in a single executemany INSERT and commit"""
+    db.bulk_insert_mappings(TaskFeedback, feedback_data)
+    db.commit()
+
 def get_task(db, task_id):
     """Get a task by ID"""
-    from src.models.task import Task  # Fixed import path
     return db.query(Task).filter(Task.id == task_id).first()
 
+def get_task_bundle(db, task_id):
+    """
+    Get a task with its estimates, feedback and notes loaded,
+    one query per relationship instead of a round trip per helper call
+    """
+    return (
+        db.query(Task)
+        .options(selectinload(Task.estimates), selectinload(Task.feedback), selectinload(Task.notes))
+        .filter(Task.id == task_id)
+        .first()
+    )
+
 def get_task_estimates(db, task_id):
     """Get all estimates for a task"""
-    from src.models.task import TaskEstimate  # Fixed import path
     return db.query(TaskEstimate).filter(TaskEstimate.task_id == task_id).all()
 
 def get_task_feedback(db, task_id):
     """Get all feedback for a task"""
-    from src.models.task import TaskFeedback  # Fixed import path
     return db.query(TaskFeedback).filter(TaskFeedback.task_id == task_id).all()
 
 def update_task(db, task_id, update_data):
     """Update a task"""
-    from src.models.task import Task  # Fixed import path
     task = db.query(Task).filter(Task.id == task_id).first()
     if task:
         for key, value in update_data.items():
@@ -114,28 +165,85 @@ def update_task(db, task_id, update_data):
         db.refresh(task)
     return task
 
+def save_project_tasks(db, project_id, tasks, estimates):
+    """
+    Save a project's subtasks and estimates in a single transaction.
+    Task IDs are prefixed with the project ID since planner IDs are only unique per project.
+    """
+    
+    def scoped_id(task_id):
+        return f"{project_id}:{task_id}"
+    
+    # Replace what an earlier save of this project left behind: its estimates, and tasks
+    # (with their feedback) the planner no longer returns
+    project_rows = f"{project_id}:%"
+    current_ids = [scoped_id(task["id"]) for task in tasks]
+    db.query(TaskEstimate).filter(TaskEstimate.task_id.like(project_rows)).delete(synchronize_session=False)
+    for model, column in ((TaskFeedback, TaskFeedback.task_id), (Task, Task.id)):
+        db.query(model).filter(column.like(project_rows), column.notin_(current_ids)).delete(synchronize_session=False)
+    
+    for task in tasks:
+        db.merge(Task(
+            id=scoped_id(task["id"]),
+            title=task["title"],
+            description=task.get("description"),
+            dependencies=[scoped_id(dep) for dep in task.get("dependencies", [])],
+            priority=task.get("priority")
+        ))
+    
+    # Estimates for IDs the planner did not return have no task row to reference, so skip them
+    matched = [estimate for estimate in estimates if scoped_id(estimate["task_id"]) in current_ids]
+    if len(matched) < len(estimates):
+        logger.warning(f"Skipping {len(estimates) - len(matched)} estimates with no matching task in project {project_id}")
+    
+    # Flush the tasks first so the estimates' foreign keys resolve
+    db.flush()
+    db.bulk_insert_mappings(TaskEstimate, [
+        {
+            "task_id": scoped_id(estimate["task_id"]),
+            "estimated_duration_minutes": estimate["estimated_duration_minutes"],
+            "confidence_score": estimate["confidence_score"],
+            "historical_data_used": estimate["historical_data_used"]
+        }
+        for estimate in matched
+    ])
+    
+    db.commit()
+
 def add_note(db, note_data):
     """Add a new note to the database"""
-    from src.models.task import Note
     note = Note(**note_data)
     db.add(note)
     db.commit()
     db.refresh(note)
     return note
 
+def bulk_add_notes(db, notes_data):
+    """Add many notes in a single executemany INSERT and commit"""
+    db.bulk_insert_mappings(Note, notes_data)
+    db.commit()
+
+def get_notes(db, assigned=None):
+    """
+    Get all notes, or only those assigned (True) or not assigned (False) to a project
+    """
+    query = db.query(Note)
+    if assigned is True:
+        query = query.filter(Note.project_id.isnot(None))
+    elif assigned is False:
+        query = query.filter(Note.project_id.is_(None))
+    return query.order_by(Note.id).all()
+
 def get_note(db, note_id):
     """Get a note by ID"""
-    from src.models.task import Note
     return db.query(Note).filter(Note.id == note_id).first()
 
 def get_task_notes(db, task_id):
     """Get all notes for a task"""
-    from src.models.task import Note
     return db.query(Note).filter(Note.task_id == task_id).all()
 
 def update_note(db, note_id, update_data):
     """Update a note"""
-    from src.models.task import Note
     note = db.query(Note).filter(Note.id == note_id).first()
     if note:
         for key, value in update_data.items():
@@ -146,7 +254,6 @@ def update_note(db, note_id, update_data):
 
 def delete_note(db, note_id):
     """Delete a note"""
-    from src.models.task import Note
     note = db.query(Note).filter(Note.id == note_id).first()
     if note:
         db.delete(note)
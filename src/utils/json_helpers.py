@@ -1,27 +1,65 @@
 import re
 import json
 
+# orjson is a faster drop-in for parsing when available; its errors subclass ValueError too
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Patterns compiled once at import rather than looked up in re's cache per call
+_FENCED_RE = re.compile(r"```(?:json)?\s*([\s\S]+?)\s*```", re.IGNORECASE)
+# A whole string literal (so brackets inside it are skipped) or a single bracket
+_JSON_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]{}]', re.DOTALL)
+
+def _scan_json(text: str):
+    """
+    Return the first balanced JSON object or array in text, or None if there is none.
+    One pass over the text tracking bracket depth, ignoring brackets inside string literals.
+    """
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        return None
+    start = min(starts)
+
+    depth = 0
+    for token in _JSON_TOKEN_RE.finditer(text, start):
+        char = token.group()
+        if char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start:token.end()]
+    return None
+
 def extract_json_block(text: str) -> str:
     """
     Extract the first JSON object or array from a string.
     Handles markdown-style code blocks and plain JSON.
     """
     # First: Try to extract from ```json ... ```
-    fenced = re.search(r"```(?:json)?\s*([\s\S]+?)\s*```", text, re.IGNORECASE)
+    fenced = _FENCED_RE.search(text)
     if fenced:
         return fenced.group(1).strip()
 
     # Then: Look for the first {...} or [...] block
-    unfenced = re.search(r"(\{[\s\S]+?\}|\[[\s\S]+?\])", text)
+    unfenced = _scan_json(text)
     if unfenced:
-        return unfenced.group(1).strip()
+        return unfenced
 
     raise ValueError("No JSON block found in LLM response.")
 
 def robust_json_load(s: str):
-    import re
-
     s = s.strip()
+
+    # Fast path: the response is often already clean JSON, so skip the cleanup and regex
+    try:
+        return _loads(s)
+    except ValueError:
+        pass
+
     if s.startswith("```json"):
         s = s[7:]
     if s.endswith("```"):
@@ -29,11 +67,11 @@ def robust_json_load(s: str):
     s = s.strip()
 
     # Attempt to extract the most JSON-like substring
-    match = re.search(r"(\[.*\]|\{.*\})", s, re.DOTALL)
-    if match:
-        s = match.group(0)
+    scanned = _scan_json(s)
+    if scanned:
+        s = scanned
 
     try:
-        return json.loads(s)
+        return _loads(s)
     except Exception as e:
         raise ValueError(f"robust_json_load failed: {e}")
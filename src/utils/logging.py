@@ -1,15 +1,20 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 from datetime import datetime
-from dotenv import load_dotenv
-
-load_dotenv()
 
 # Create logs directory if it doesn't exist
 os.makedirs('logs', exist_ok=True)
 
+# Listener that writes queued records to the real handlers on a background thread
+_listener = None
+
 # Configure logging
 def setup_logging():
+    global _listener
+
     log_level = os.getenv('LOG_LEVEL', 'INFO')
     log_file = f'logs/task_agent_{datetime.now().strftime("%Y%m%d")}.log'
     
@@ -21,11 +26,19 @@ def setup_logging():
         '%(levelname)s - %(message)s'
     )
     
-    # Create file handler
-    file_handler = logging.FileHandler(log_file)
+    # Create file handler, rotated so the log stays bounded and opened on first write
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=50 * 1024 * 1024, backupCount=5, delay=True
+    )
     file_handler.setLevel(log_level)
     file_handler.setFormatter(file_formatter)
     
+    # Buffer file writes, flushing every 256 records or immediately on errors
+    buffered_file_handler = logging.handlers.MemoryHandler(
+        capacity=256, flushLevel=logging.ERROR, target=file_handler
+    )
+    buffered_file_handler.setLevel(log_level)
+    
     # Create console handler
     console_handler = logging.StreamHandler()
     console_handler.setLevel(log_level)
@@ -38,46 +51,54 @@ def setup_logging():
     # Remove existing handlers
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
+    if _listener is not None:
+        _listener.stop()
     
-    # Add handlers
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Log calls only enqueue the record; the listener thread does the file and console writes
+    log_queue = queue.Queue(-1)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(
+        log_queue, buffered_file_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
     
     return logger
 
 # Create logger instance
 logger = setup_logging()
 
+# Drain queued records before the interpreter exits; logging's own shutdown hook,
+# registered earlier and so run after this one, then flushes the file buffer
+atexit.register(lambda: _listener.stop())
+
 def log_task_creation(task_id, title):
     """Log task creation"""
-    logger.info(f"Task created - ID: {task_id}, Title: {title}")
+    logger.info("Task created - ID: %s, Title: %s", task_id, title)
 
 def log_task_estimation(task_id, estimated_duration, confidence):
     """Log task estimation"""
     logger.info(
-        f"Task estimated - ID: {task_id}, "
-        f"Duration: {estimated_duration} minutes, "
-        f"Confidence: {confidence}"
+        "Task estimated - ID: %s, Duration: %s minutes, Confidence: %s",
+        task_id, estimated_duration, confidence
     )
 
 def log_task_scheduling(task_id, start_time, end_time):
     """Log task scheduling"""
     logger.info(
-        f"Task scheduled - ID: {task_id}, "
-        f"Start: {start_time}, End: {end_time}"
+        "Task scheduled - ID: %s, Start: %s, End: %s",
+        task_id, start_time, end_time
     )
 
 def log_task_feedback(task_id, actual_duration, accuracy):
     """Log task feedback"""
     logger.info(
-        f"Task feedback - ID: {task_id}, "
-        f"Actual Duration: {actual_duration} minutes, "
-        f"Accuracy: {accuracy}"
+        "Task feedback - ID: %s, Actual Duration: %s minutes, Accuracy: %s",
+        task_id, actual_duration, accuracy
     )
 
 def log_error(error_message, error_type=None):
     """Log error messages"""
     if error_type:
-        logger.error(f"{error_type}: {error_message}")
+        logger.error("%s: %s", error_type, error_message)
     else:
-        logger.error(error_message) 
\ No newline at end of file
+        logger.error(error_message)
@@ -0,0 +1,77 @@
+import threading
+import uuid
+from typing import Any, Dict, Optional
+import chromadb
+from src.utils.logging import logger
+
+class SemanticCache:
+    """
+    In-memory cache of results keyed on the embedding of an input text.
+    A lookup hits when a stored text is at least `threshold` cosine-similar to the query
+    and its scope (e.g. session and exact constraints) matches exactly.
+    """
+    
+    def __init__(self, name: str, threshold: float = 0.97, max_entries: int = 128):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.client = chromadb.EphemeralClient()
+        self.collection = self.client.get_or_create_collection(name, metadata={"hnsw:space": "cosine"})
+        self._values: Dict[str, Any] = {}
+        # Shared by every script thread. Only the value map is guarded, so embedding and searching
+        # (which ChromaDB makes thread-safe itself) never hold up other sessions
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _where(scope: Dict[str, str]) -> Dict[str, Any]:
+        """Build a ChromaDB metadata filter requiring every scope key to match"""
+        if len(scope) == 1:
+            return dict(scope)
+        return {"$and": [{key: value} for key, value in scope.items()]}
+    
+    def lookup(self, text: str, scope: Dict[str, str]) -> Optional[Any]:
+        """Return the value cached for the most similar text within scope, or None if nothing is close enough"""
+        if not self._values:
+            return None
+        
+        try:
+            results = self.collection.query(query_texts=[text], n_results=1, where=self._where(scope))
+        except Exception as e:
+            logger.error(f"Semantic cache lookup failed: {str(e)}")
+            return None
+        
+        if not results['ids'] or not results['ids'][0]:
+            return None
+        
+        # Cosine distance is 1 - cosine similarity
+        similarity = 1.0 - results['distances'][0][0]
+        if similarity < self.threshold:
+            return None
+        
+        with self._lock:
+            # The entry may have been evicted since the search ran
+            value = self._values.get(results['ids'][0][0])
+        if value is not None:
+            logger.info(f"Semantic cache hit (similarity: {similarity:.3f})")
+        return value
+    
+    def store(self, text: str, scope: Dict[str, str], value: Any):
+        """Cache a value under the embedding of text within scope, evicting the oldest entry when full"""
+        entry_id = str(uuid.uuid4())
+        try:
+            self.collection.add(documents=[text], metadatas=[dict(scope)], ids=[entry_id])
+        except Exception as e:
+            logger.error(f"Semantic cache store failed: {str(e)}")
+            return
+        
+        with self._lock:
+            self._values[entry_id] = value
+            oldest_id = None
+            if len(self._values) > self.max_entries:
+                oldest_id = next(iter(self._values))
+                del self._values[oldest_id]
+        
+        if oldest_id is not None:
+            try:
+                self.collection.delete(ids=[oldest_id])
+            except Exception as e:
+                logger.error(f"Semantic cache eviction failed: {str(e)}")